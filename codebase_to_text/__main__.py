@@ -0,0 +1,4 @@
+from codebase_to_text.codebase_to_text import main
+
+if __name__ == "__main__":
+    main()
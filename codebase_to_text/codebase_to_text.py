@@ -1,106 +1,260 @@
+import io
 import os
-import argparse
-import git
 import shutil
-from pathlib import Path
-from docx import Document
+import sys
 import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from operator import attrgetter
+from codebase_to_text.utils import BINARY_EXTENSIONS, get_extension, is_hidden_file, read_text_file
+
+# Section delimiter, and the footer closing every file block
+_DELIMITER = "-" * 50
+_FILE_END = f"\n\n{_DELIMITER}\nFile End\n{_DELIMITER}\n"
+# Sort key for DirEntry objects; a C-level getter is cheaper than a lambda call
+_BY_NAME = attrgetter('name')
+
 class CodebaseToText:
-    def __init__(self, input_path, output_path, output_type, verbose, exclude_hidden):
+    def __init__(self, input_path, output_path, output_type, verbose, exclude_hidden, max_file_size=None,
+                 compact=False, gzip_output=False):
         self.input_path = input_path
         self.output_path = output_path
         self.output_type = output_type
         self.verbose = verbose
         self.exclude_hidden = exclude_hidden
+        self.max_file_size = max_file_size
+        self.compact = compact
+        self.gzip_output = gzip_output
         self.temp_folder_path = None
+        # URL the clone in temp_folder_path was made from
+        self._cloned_from = None
 
-    def _parse_folder(self, folder_path):
-        tree = ""
-        for root, dirs, files in os.walk(folder_path):
-            # Exclude hidden directories if exclude_hidden is True
-            if self.exclude_hidden:
-                dirs[:] = [d for d in dirs if not self._is_hidden_file(os.path.join(root, d))]
-
-            level = root.replace(folder_path, '').count(os.sep)
-            indent = ' ' * 4 * (level)
-            tree += '{}{}/\n'.format(indent, os.path.basename(root))
-            subindent = ' ' * 4 * (level + 1)
-            for f in files: 
-                tree += '{}{}\n'.format(subindent, f)
+    def _iter_tree(self, folder_path):
+        # Top-down walk like os.walk, but reusing the DirEntry data from
+        # os.scandir instead of re-joining and re-stat'ing every path
+        stack = [(folder_path, os.path.basename(folder_path), 0)]
+        while stack:
+            root, name, depth = stack.pop()
+            dirs = []
+            files = []
+            add_dir = dirs.append
+            add_file = files.append
+            try:
+                with os.scandir(root) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            # Symlinked directories are listed by os.walk but never entered
+                            if not entry.is_symlink():
+                                add_dir(entry)
+                        else:
+                            add_file(entry)
+            except OSError:
+                continue
+            # scandir order depends on the filesystem; sort so the output is reproducible
+            dirs.sort(key=_BY_NAME)
+            files.sort(key=_BY_NAME)
 
-        if self.verbose:
-            print(f"The file tree to be processed:\n {tree}")
+            yield root, name, depth, files
 
-        return tree
+            # Exclude hidden directories if exclude_hidden is True. Pruning here means
+            # every directory below folder_path has already been checked by its parent,
+            # so only the entry's own name needs testing.
+            if self.exclude_hidden:
+                dirs = [d for d in dirs if not is_hidden_file(d.name)]
+            elif depth == 0 and self.is_github_repo():
+                # A fresh clone holds only tracked files plus git's own metadata, so
+                # leaving out .git gives exactly what `git ls-files` would list
+                dirs = [d for d in dirs if d.name != '.git']
+            stack.extend((d.path, d.name, depth + 1) for d in reversed(dirs))
 
-    def _get_file_contents(self, file_path):
-        with open(file_path, 'r') as file:
-            return file.read()
-        
-    def _is_hidden_file(self, file_path):
-        components = os.path.normpath(file_path).split(os.sep)
-        # print(f"componetns {components}")
-        for c in components:
-            if c.startswith((".","__")):
-                return True
-        return False
-
-
-    def _process_files(self, path):
-        content = ""
-        for root, _, files in os.walk(path):
+    def _scan(self, folder_path):
+        # A single walk builds the folder tree and collects the files to read
+        tree = []
+        files_to_read = []
+        # The per-file loop runs once for every file in the codebase, so bind the
+        # attributes it uses to locals up front
+        add_line = tree.append
+        add_file = files_to_read.append
+        exclude_hidden = self.exclude_hidden
+        verbose = self.verbose
+        # Skip messages are collected and written together with the tree, one write
+        # instead of a print (and a flush on a terminal) per skipped file
+        log = []
+        add_log = log.append
+        max_file_size = self.max_file_size
+        # get_file creates the output before the walk, so an output path inside the
+        # input folder would otherwise be read back into itself. Names are compared
+        # first so realpath only runs for the odd file that matches.
+        output_name = os.path.normcase(os.path.basename(self.output_path))
+        output_path = os.path.realpath(self.output_path)
+        for _, name, depth, files in self._iter_tree(folder_path):
+            indent = ' ' * 4 * depth
+            add_line('{}{}/\n'.format(indent, name))
+            subindent = indent + ' ' * 4
             for file in files:
-                file_path = os.path.join(root, file)
-                if self.exclude_hidden and self._is_hidden_file(os.path.abspath(file_path)):
-                    if self.verbose:
-                        print(f"Ignoring hidden file {file_path}")
+                file_name = file.name
+                if os.path.normcase(file_name) == output_name and os.path.realpath(file.path) == output_path:
+                    continue
+                add_line('{}{}\n'.format(subindent, file_name))
+                if exclude_hidden and is_hidden_file(file_name):
+                    if verbose:
+                        add_log(f"Ignoring hidden file {file.path}\n")
+                    continue
+                extension = get_extension(file_name)
+                if extension.lower() in BINARY_EXTENSIONS:
+                    if verbose:
+                        add_log(f"Ignoring binary file {file.path}\n")
                     continue
+                if max_file_size is not None:
+                    # DirEntry.stat() is cached (and free on Windows), so oversized files
+                    # are dropped without ever being opened
+                    try:
+                        too_large = file.stat().st_size > max_file_size
+                    except OSError:
+                        # Left to the read, which reports unreadable files
+                        too_large = False
+                    if too_large:
+                        if verbose:
+                            add_log(f"Ignoring large file {file.path}\n")
+                        continue
+                add_file((file, extension))
+        tree = ''.join(tree)
 
-                try:
-                    if self.verbose:
-                        print(f"Processing: {file_path}")
-                    file_content = self._get_file_contents(file_path)
-                    content += f"\n\n{file_path}\n"
-                    content += f"File type: {os.path.splitext(file_path)[1]}\n"
-                    content += f"{file_content}"
-                    # Add section headers and delimiters after each file
-                    content += f"\n\n{'-' * 50}\nFile End\n{'-' * 50}\n"
-                except:
-                    print(f"Couldn't process {file_path}")
-        return content
+        if verbose:
+            add_log(f"The file tree to be processed:\n {tree}\n")
+            sys.stdout.write(''.join(log))
 
-    def get_text(self):
-        folder_structure = ""
-        file_contents = ""
+        return tree, files_to_read
+
+    def _format_file(self, file, extension, read):
+        # read returns the decoded contents, None for binary files, or raises
+        file_path = file.path
+        try:
+            if self.verbose:
+                sys.stdout.write(f"Processing: {file_path}\n")
+            file_content = read()
+            if file_content is None:
+                if self.verbose:
+                    sys.stdout.write(f"Ignoring binary file {file_path}\n")
+                return None
+        except:
+            sys.stdout.write(f"Couldn't process {file_path}\n")
+            return None
+        if self.compact:
+            # A single short header line instead of the type line and two banners
+            return f"\n==> {file_path} <==\n{file_content}\n"
+        # Add section headers and delimiters after each file
+        return (f"\n\n{file_path}\n"
+                f"File type: {extension}\n"
+                f"{file_content}{_FILE_END}")
+
+    def _iter_file_contents(self, files_to_read):
+        if len(files_to_read) <= 4:
+            # Too few files to pay for starting the thread pool
+            for file, extension in files_to_read:
+                chunk = self._format_file(file, extension, partial(read_text_file, file.path))
+                if chunk is not None:
+                    yield chunk
+            return
+
+        # Reading files is I/O bound and releases the GIL, so overlap the reads in a
+        # thread pool. Results are consumed in walk order to keep the output stable,
+        # and only a bounded window of reads is queued ahead of the consumer so the
+        # buffered contents stay proportional to the pool size, not the repository.
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for file, extension in files_to_read:
+                pending.append((file, extension, executor.submit(read_text_file, file.path).result))
+                if len(pending) < max_workers * 2:
+                    continue
+                chunk = self._format_file(*pending.popleft())
+                if chunk is not None:
+                    yield chunk
+            while pending:
+                chunk = self._format_file(*pending.popleft())
+                if chunk is not None:
+                    yield chunk
+
+    def _get_scan(self):
         if self.is_github_repo():
-            self._clone_github_repo()
-            folder_structure = self._parse_folder(self.temp_folder_path)
-            file_contents = self._process_files(self.temp_folder_path)
+            # A repeated call (get_text then get_file) reuses the clone of the same URL.
+            # The folder itself is walked afresh on every call, so added, deleted or
+            # resized files are always picked up.
+            # Clone again if the folder was removed (clean_up_temp_folder, or externally)
+            if self._cloned_from != self.input_path or not os.path.isdir(self.temp_folder_path):
+                if self.temp_folder_path:
+                    shutil.rmtree(self.temp_folder_path, ignore_errors=True)
+                self._clone_github_repo()
+            folder_path = self.temp_folder_path
         else:
-            folder_structure = self._parse_folder(self.input_path)
-            file_contents = self._process_files(self.input_path)
-        
+            folder_path = self.input_path
+        return self._scan(folder_path)
+
+    def _iter_text(self):
+        folder_structure, files_to_read = self._get_scan()
+
         # Section headers
         folder_structure_header = "Folder Structure"
         file_contents_header = "File Contents"
         
-        # Delimiters
-        delimiter = "-" * 50
-        
-        # Format the final text
-        final_text = f"{folder_structure_header}\n{delimiter}\n{folder_structure}\n\n{file_contents_header}\n{delimiter}\n{file_contents}"
-        
-        return final_text
+        yield f"{folder_structure_header}\n{_DELIMITER}\n{folder_structure}\n\n{file_contents_header}\n{_DELIMITER}\n"
+        # File contents are produced one file at a time so callers can stream them
+        yield from self._iter_file_contents(files_to_read)
+
+    def write_text(self, out):
+        # writelines drives the generator from C, one call for the whole stream
+        out.writelines(self._iter_text())
+
+    def get_text(self):
+        # ''.join would first collect every chunk into a list; StringIO appends
+        # them to a single growing buffer instead
+        buf = io.StringIO()
+        self.write_text(buf)
+        return buf.getvalue()
+
+    def get_folder_structure(self):
+        return self._get_scan()[0]
+
+    def get_file_contents(self):
+        buf = io.StringIO()
+        buf.writelines(self._iter_file_contents(self._get_scan()[1]))
+        return buf.getvalue()
 
 
     def get_file(self):
-        text = self.get_text()
         if self.output_type == "txt":
-            with open(self.output_path, "w") as file:
-                file.write(text)
+            # Stream straight to disk so memory stays bounded by the largest file;
+            # the large buffer batches the write syscalls
+            if self.gzip_output:
+                import gzip
+
+                # Level 1 is nearly as fast as a plain write and still shrinks text several times
+                file = gzip.open(self.output_path, "wt", encoding="utf-8", compresslevel=1)
+            else:
+                file = open(self.output_path, "w", encoding="utf-8", buffering=1 << 20)
+            with file:
+                self.write_text(file)
         elif self.output_type == "docx":
+            if self.gzip_output:
+                raise ValueError("Gzip compression is only supported for txt output")
+            # python-docx and GitPython are slow to import, so only load them when used
+            from docx import Document
+
             doc = Document()
-            doc.add_paragraph(text)
+            # One paragraph per file rather than one giant paragraph. add_paragraph
+            # searches the body for its sectPr on every call, so insert each paragraph
+            # before a fixed anchor instead and drop the anchor at the end.
+            anchor = doc.add_paragraph()
+            # Resolve the style once; the blocks carry their own blank lines, so the
+            # default paragraph spacing would only add gaps
+            style = doc.styles["No Spacing"]
+            for chunk in self._iter_text():
+                anchor.insert_paragraph_before(chunk, style)
+            # python-docx has no public API for deleting a paragraph; _element is its
+            # internal lxml node, so recheck this line when upgrading the library
+            anchor._element.getparent().remove(anchor._element)
             doc.save(self.output_path)
         else:
             raise ValueError("Invalid output type. Supported types: txt, docx")
@@ -108,9 +262,15 @@ class CodebaseToText:
     #### Github ####
 
     def _clone_github_repo(self):
+        import git
+
         try:
             self.temp_folder_path = tempfile.mkdtemp(prefix="github_repo_")
-            repo = git.Repo.clone_from(self.input_path, self.temp_folder_path)
+            # Only the working tree is read, so skip the history and tags and fetch just the
+            # blobs needed for the checkout
+            repo = git.Repo.clone_from(self.input_path, self.temp_folder_path, depth=1,
+                                       multi_options=["--filter=blob:none", "--single-branch", "--no-tags"])
+            self._cloned_from = self.input_path
             if self.verbose:
                 print("GitHub repository cloned successfully.")
         except Exception as e:
@@ -125,22 +285,34 @@ class CodebaseToText:
     def clean_up_temp_folder(self):
         if self.temp_folder_path:
             shutil.rmtree(self.temp_folder_path)
+            # Forget the clone so a later call makes a fresh one
+            self.temp_folder_path = None
+            self._cloned_from = None
 
 
 def main():
+    # Only the command line needs argparse, keep it out of library imports
+    import argparse
+
     parser = argparse.ArgumentParser(description="Generate text from codebase.")
     parser.add_argument("--input", help="Input path (folder or GitHub URL)", required=True)
     parser.add_argument("--output", help="Output file path", required=True)
     parser.add_argument("--output_type", help="Output file type (txt or docx)", required=True)
     parser.add_argument("--exclude_hidden", help="Exclude hidden files and folders", action="store_true")
     parser.add_argument("--verbose", help="Show useful information", action="store_true")
+    parser.add_argument("--max_file_size", help="Skip files larger than this many bytes", type=int)
+    parser.add_argument("--compact", help="Use a single short header line per file", action="store_true")
+    parser.add_argument("--gzip", help="Gzip-compress the output (txt output type only)", action="store_true")
     args = parser.parse_args()
 
     code_to_text = CodebaseToText(input_path=args.input,
                                 output_path=args.output,
                                 output_type=args.output_type,
                                 verbose=args.verbose,
-                                exclude_hidden=args.exclude_hidden)
+                                exclude_hidden=args.exclude_hidden,
+                                max_file_size=args.max_file_size,
+                                compact=args.compact,
+                                gzip_output=args.gzip)
     code_to_text.get_file()
 
     # Remove temporary folder if it was used
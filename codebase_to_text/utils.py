@@ -0,0 +1,51 @@
+import os
+
+# Bytes that may appear in text files; anything else counts towards the binary ratio
+TEXT_CHARACTERS = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+
+# Extensions that are always binary, so they can be skipped without opening the file
+BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.ico',
+    '.zip', '.gz', '.bz2', '.xz', '.7z', '.tar', '.jar', '.whl', '.wasm',
+    '.pyc', '.pyo', '.o', '.so', '.dylib', '.dll', '.exe', '.class',
+    '.pdf', '.woff', '.woff2', '.ttf', '.otf',
+    '.mp3', '.mp4', '.mov', '.avi', '.webm',
+})
+
+
+def is_hidden_file(file_path):
+    # Ancestors are pruned by the walker, so only the last component matters
+    return os.path.basename(file_path).startswith((".", "__"))
+
+
+def get_extension(file_name):
+    # Same result as os.path.splitext(file_name)[1] for a bare name (leading dots
+    # never start an extension), without the path and drive handling
+    _, dot, extension = file_name.lstrip('.').rpartition('.')
+    return dot + extension if dot else ''
+
+
+def is_binary_block(block):
+    # Same heuristic as git/file: a NUL byte, or more than 30% control characters
+    if b'\0' in block:
+        return True
+    return len(block.translate(None, TEXT_CHARACTERS)) > len(block) * 0.3
+
+
+def read_text_file(file_path):
+    # One unbuffered read (sized from fstat) and a single decode is much cheaper
+    # than streaming the file through the text-mode incremental decoder.
+    # The first block doubles as the binary probe, so binary files are rejected
+    # on the same open without reading the rest of them; None means binary.
+    with open(file_path, 'rb', buffering=0) as file:
+        data = file.read(4096)
+        if is_binary_block(data):
+            return None
+        data += file.read()
+    # Always UTF-8, whatever the locale encoding; anything else raises and the
+    # caller reports the file as unprocessable
+    text = data.decode('utf-8')
+    if '\r' in text:
+        # Keep the universal newline translation text mode used to apply
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
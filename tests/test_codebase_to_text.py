@@ -4,6 +4,10 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from codebase_to_text.codebase_to_text import CodebaseToText
 import shutil
+import contextlib
+import gzip
+import io
+from unittest import mock
 
 
 class TestCodebaseToText(unittest.TestCase):
@@ -22,6 +26,238 @@ class TestCodebaseToText(unittest.TestCase):
         expected_text = f"Folder structure:\n{self.test_folder_path}/\n    test_file1.txt\n    test_file2.txt\n\nFile Contents:\n\n{self.test_folder_path}/test_file1.txt\nFile type: Text (.txt)\nTest file 1 content\n\n{self.test_folder_path}/test_file2.txt\nFile type: Text (.txt)\nTest file 2 content"
         self.assertEqual(text, expected_text)
 
+    def test_binary_file_is_skipped(self):
+        with open(os.path.join(self.test_folder_path, "image.bin"), "wb") as file:
+            file.write(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False)
+        file_contents = code_to_text.get_file_contents()
+        self.assertIn("image.bin", code_to_text.get_folder_structure())
+        self.assertNotIn(os.path.join(self.test_folder_path, "image.bin"), file_contents)
+        self.assertIn("Test file 1 content", file_contents)
+
+    def test_control_heavy_file_is_skipped(self):
+        # No NUL byte, so only the control-character ratio marks it as binary
+        with open(os.path.join(self.test_folder_path, "control.dat"), "wb") as file:
+            file.write(bytes(range(1, 32)) * 10)
+        with open(os.path.join(self.test_folder_path, "unicode.txt"), "w", encoding="utf-8") as file:
+            file.write("Grüße, naïve café — ✓ 日本語")
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False)
+        file_contents = code_to_text.get_file_contents()
+        self.assertNotIn("control.dat", file_contents)
+        self.assertIn("Grüße, naïve café — ✓ 日本語", file_contents)
+
+    def test_binary_extension_is_skipped_without_reading(self):
+        # Text bytes, so only the case-insensitive extension check can skip it
+        with open(os.path.join(self.test_folder_path, "photo.PNG"), "w") as file:
+            file.write("not really an image")
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False)
+        self.assertIn("photo.PNG", code_to_text.get_folder_structure())
+        file_contents = code_to_text.get_file_contents()
+        self.assertNotIn("photo.PNG", file_contents)
+        self.assertNotIn("not really an image", file_contents)
+
+    def test_text_obj_file_is_kept(self):
+        # .obj is also the plain-text Wavefront 3D model format
+        with open(os.path.join(self.test_folder_path, "model.obj"), "w") as file:
+            file.write("v 0.0 1.0 0.0")
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False)
+        self.assertIn("v 0.0 1.0 0.0", code_to_text.get_file_contents())
+
+    def test_max_file_size(self):
+        with open(os.path.join(self.test_folder_path, "large.txt"), "w") as file:
+            file.write("x" * 100)
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False, max_file_size=50)
+        file_contents = code_to_text.get_file_contents()
+        self.assertIn("large.txt", code_to_text.get_folder_structure())
+        self.assertNotIn("x" * 100, file_contents)
+        self.assertIn("Test file 2 content", file_contents)
+
+    def test_verbose_skip_messages_come_before_processing(self):
+        with open(os.path.join(self.test_folder_path, ".hidden.txt"), "w") as file:
+            file.write("hidden")
+        with open(os.path.join(self.test_folder_path, "large.txt"), "w") as file:
+            file.write("x" * 100)
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=True, exclude_hidden=True, max_file_size=50)
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            code_to_text.get_text()
+        output = stdout.getvalue()
+        hidden_line = f"Ignoring hidden file {os.path.join(self.test_folder_path, '.hidden.txt')}\n"
+        large_line = f"Ignoring large file {os.path.join(self.test_folder_path, 'large.txt')}\n"
+        self.assertIn(hidden_line, output)
+        self.assertIn(large_line, output)
+        self.assertLess(output.index(hidden_line), output.index("Processing:"))
+        self.assertLess(output.index(large_line), output.index("Processing:"))
+        self.assertIn(f"Processing: {os.path.join(self.test_folder_path, 'test_file1.txt')}\n", output)
+
+    def test_compact_output(self):
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False, compact=True)
+        text = code_to_text.get_text()
+        file_path = os.path.join(self.test_folder_path, "test_file1.txt")
+        self.assertIn(f"\n==> {file_path} <==\nTest file 1 content\n", text)
+        self.assertNotIn("File End", text)
+
+    def test_get_text_combines_sections(self):
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False)
+        text = code_to_text.get_text()
+        self.assertTrue(text.startswith(f"Folder Structure\n{'-' * 50}\n{code_to_text.get_folder_structure()}"))
+        self.assertTrue(text.endswith(code_to_text.get_file_contents()))
+
+    def test_entries_are_sorted_by_name(self):
+        os.makedirs(os.path.join(self.test_folder_path, "b_dir"))
+        os.makedirs(os.path.join(self.test_folder_path, "a_dir"))
+        with open(os.path.join(self.test_folder_path, "a_dir", "z.txt"), "w") as file:
+            file.write("z")
+        with open(os.path.join(self.test_folder_path, "a_dir", "y.txt"), "w") as file:
+            file.write("y")
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False)
+        expected_tree = (f"{self.test_folder_path}/\n    test_file1.txt\n    test_file2.txt\n"
+                         "    a_dir/\n        y.txt\n        z.txt\n    b_dir/\n")
+        self.assertEqual(code_to_text.get_folder_structure(), expected_tree)
+
+    def test_output_inside_input_folder_is_not_read(self):
+        output_path = os.path.join(self.test_folder_path, "output.txt")
+        with open(output_path, "w") as file:
+            file.write("Previous output")
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path=output_path, output_type="txt",
+                                      verbose=False, exclude_hidden=False)
+        code_to_text.get_file()
+        with open(output_path, encoding="utf-8") as file:
+            text = file.read()
+        self.assertNotIn("output.txt", text)
+        self.assertNotIn("Previous output", text)
+        self.assertEqual(text.count("File End"), 2)
+
+    def test_gzip_output(self):
+        output_path = "output.txt.gz"
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path=output_path, output_type="txt",
+                                      verbose=False, exclude_hidden=False, gzip_output=True)
+        code_to_text.get_file()
+        self.addCleanup(os.remove, output_path)
+        with gzip.open(output_path, "rt", encoding="utf-8") as file:
+            self.assertEqual(file.read(), code_to_text.get_text())
+
+    def test_gzip_output_rejects_docx(self):
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.docx", output_type="docx",
+                                      verbose=False, exclude_hidden=False, gzip_output=True)
+        with self.assertRaises(ValueError):
+            code_to_text.get_file()
+        self.assertFalse(os.path.exists("output.docx"))
+
+    def test_docx_output(self):
+        from docx import Document
+
+        output_path = "output.docx"
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path=output_path, output_type="docx",
+                                      verbose=False, exclude_hidden=False)
+        code_to_text.get_file()
+        self.addCleanup(os.remove, output_path)
+        paragraphs = Document(output_path).paragraphs
+        # The header, then one paragraph per file and no leftover empty anchor
+        self.assertEqual(len(paragraphs), 3)
+        self.assertTrue(all(paragraph.text for paragraph in paragraphs))
+        self.assertTrue(paragraphs[0].text.startswith("Folder Structure"))
+        file_path = os.path.join(self.test_folder_path, "test_file1.txt")
+        self.assertEqual(paragraphs[1].text,
+                         f"\n\n{file_path}\nFile type: .txt\nTest file 1 content\n\n{'-' * 50}\nFile End\n{'-' * 50}\n")
+        self.assertEqual(paragraphs[1].style.name, "No Spacing")
+
+    def test_many_files_keep_walk_order(self):
+        # Enough files to go through the thread pool and overflow its read-ahead window
+        many_folder = os.path.join(self.test_folder_path, "many")
+        os.makedirs(many_folder)
+        for i in range(100):
+            with open(os.path.join(many_folder, f"f{i:03}.txt"), "wb") as file:
+                # f050.txt is not valid UTF-8, so its read fails in the middle of the run
+                file.write(b"\xff\xfe\xfa" if i == 50 else f"content {i}".encode())
+        code_to_text = CodebaseToText(input_path=many_folder, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False)
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            file_contents = code_to_text.get_file_contents()
+        bad_path = os.path.join(many_folder, "f050.txt")
+        self.assertIn(f"Couldn't process {bad_path}", stdout.getvalue())
+        self.assertNotIn(bad_path, file_contents)
+        expected = "".join(f"\n\n{os.path.join(many_folder, f'f{i:03}.txt')}\nFile type: .txt\ncontent {i}"
+                           f"\n\n{'-' * 50}\nFile End\n{'-' * 50}\n" for i in range(100) if i != 50)
+        self.assertEqual(file_contents, expected)
+
+    def test_repeated_calls_see_file_changes(self):
+        code_to_text = CodebaseToText(input_path=self.test_folder_path, output_path="output.txt", output_type="txt",
+                                      verbose=False, exclude_hidden=False)
+        code_to_text.get_text()
+        os.remove(os.path.join(self.test_folder_path, "test_file1.txt"))
+        with open(os.path.join(self.test_folder_path, "test_file3.txt"), "w") as file:
+            file.write("Test file 3 content")
+        text = code_to_text.get_text()
+        self.assertNotIn("test_file1.txt", text)
+        self.assertIn("Test file 3 content", text)
+
+    def test_clone_is_reused_only_for_the_same_url(self):
+        import git
+
+        cloned = []
+
+        def fake_clone(url, path, **kwargs):
+            cloned.append(url)
+            with open(os.path.join(path, url.rsplit("/", 1)[1] + ".txt"), "w") as file:
+                file.write(url)
+
+        code_to_text = CodebaseToText(input_path="https://github.com/user/one", output_path="output.txt",
+                                      output_type="txt", verbose=False, exclude_hidden=False)
+        with mock.patch.object(git.Repo, "clone_from", side_effect=fake_clone):
+            code_to_text.get_text()
+            self.assertIn("one.txt", code_to_text.get_folder_structure())
+            code_to_text.input_path = "https://github.com/user/two"
+            folder_structure = code_to_text.get_folder_structure()
+        code_to_text.clean_up_temp_folder()
+        self.assertEqual(cloned, ["https://github.com/user/one", "https://github.com/user/two"])
+        self.assertIn("two.txt", folder_structure)
+        self.assertNotIn("one.txt", folder_structure)
+
+    def test_clone_is_made_again_after_clean_up(self):
+        import git
+
+        def fake_clone(url, path, **kwargs):
+            with open(os.path.join(path, "repo_file.txt"), "w") as file:
+                file.write("Repo file content")
+
+        code_to_text = CodebaseToText(input_path="https://github.com/user/repo", output_path="output.txt",
+                                      output_type="txt", verbose=False, exclude_hidden=False)
+        with mock.patch.object(git.Repo, "clone_from", side_effect=fake_clone) as clone_from:
+            code_to_text.get_text()
+            code_to_text.clean_up_temp_folder()
+            self.assertFalse(code_to_text.is_temp_folder_used())
+            text = code_to_text.get_text()
+        code_to_text.clean_up_temp_folder()
+        self.assertEqual(clone_from.call_count, 2)
+        self.assertIn("repo_file.txt", text)
+        self.assertIn("Repo file content", text)
+
+    def test_git_folder_left_out_of_github_clone(self):
+        import git
+
+        def fake_clone(url, path, **kwargs):
+            for folder in (".git", ".github"):
+                os.makedirs(os.path.join(path, folder))
+                with open(os.path.join(path, folder, "config"), "w") as file:
+                    file.write(folder)
+
+        code_to_text = CodebaseToText(input_path="https://github.com/user/repo", output_path="output.txt",
+                                      output_type="txt", verbose=False, exclude_hidden=False)
+        with mock.patch.object(git.Repo, "clone_from", side_effect=fake_clone):
+            folder_structure = code_to_text.get_folder_structure()
+        code_to_text.clean_up_temp_folder()
+        self.assertNotIn(".git/", folder_structure)
+        self.assertIn("    .github/\n        config\n", folder_structure)
+
     def tearDown(self):
         # Clean up temporary folder
         if os.path.exists(self.test_folder_path):